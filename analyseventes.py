@@ -1,80 +1,275 @@
+import os
+import sys
+import matplotlib
+
+# Sans serveur d'affichage, bascule sur le backend Agg : rendu pur en
+# mémoire, nettement plus rapide que les backends interactifs, et les
+# graphiques sont alors sauvegardés en PNG au lieu d'être affichés.
+# Uniquement sur Linux : macOS n'utilise pas DISPLAY et son backend
+# natif macosx affiche très bien les fenêtres
+if sys.platform.startswith('linux') and not os.environ.get('DISPLAY') and not os.environ.get('WAYLAND_DISPLAY'):
+    matplotlib.use('Agg')
+
 import pandas as pd
 import matplotlib.pyplot as plt
-import seaborn as sns
+import matplotlib.dates as mdates
+import matplotlib.text as mtext
 from datetime import datetime
+from functools import lru_cache
 import numpy as np
 
-# Configuration pour des graphiques plus jolis
-plt.style.use('seaborn-v0_8')
-sns.set_palette("husl")
+# numba est optionnel : sans lui, le comptage repasse par numpy pur
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Les styles sont appliqués paresseusement au premier tracé (voir
+# _configurer_style) : les appels purement statistiques (plot=False)
+# n'importent pas seaborn et ne touchent pas aux rcParams globaux
+_style_configure = False
+
+def _configurer_style():
+    """Applique une seule fois la configuration graphique (seaborn + style)."""
+    global _style_configure
+    if _style_configure:
+        return
+    # Configuration pour des graphiques plus jolis
+    import seaborn as sns
+    plt.style.use('seaborn-v0_8')
+    sns.set_palette("husl")
+    _style_configure = True
+
+# Définition des codes pays francophones (ISO 2 lettres)
+PAYS_FRANCOPHONES = ['fr', 'be', 'ch', 'nc', 'ca', 'lu']  # France, Belgique, Suisse, Nouvelle-Calédonie, Canada, Luxembourg
+
+# Table précalculée de 26x26 entrées : un code pays = 2 lettres ascii
+# minuscules, donc un indice (c0-'a')*26 + (c1-'a'). L'appartenance
+# francophone devient une lecture indexée, sans hachage ni comparaison
+_TABLE_FRANCO = np.zeros(26 * 26, dtype=bool)
+for _cc in PAYS_FRANCOPHONES:
+    _TABLE_FRANCO[(ord(_cc[0]) - 97) * 26 + (ord(_cc[1]) - 97)] = True
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def _compter_par_periode(cles, franco):
+        """
+        Comptage fusionné : lit une seule fois les clés de période (int64) et
+        l'indicateur francophone (0/1) et cumule dans une matrice dense
+        (périodes x 2) indexée à partir de la clé minimale. Pas de tri ni de
+        hachage, une seule passe mémoire sur les tableaux chauds.
+        """
+        kmin = cles[0]
+        kmax = cles[0]
+        for i in range(cles.size):
+            k = cles[i]
+            if k < kmin:
+                kmin = k
+            elif k > kmax:
+                kmax = k
+        counts = np.zeros((kmax - kmin + 1, 2), dtype=np.int32)
+        for i in range(cles.size):
+            counts[cles[i] - kmin, franco[i]] += 1
+        return kmin, counts
+
+# Calcul des clés de période spécialisé par regroupement : une petite
+# fonction par fréquence, avec l'unité datetime64 et les constantes en dur,
+# sélectionnée par une seule recherche de dict au lieu de re-brancher sur le
+# code de regroupement à chaque appel. Chaque variante est une unique
+# opération C vectorisée sur le tableau datetime64
+def _cles_semaine(dates64):
+    # Les semaines datetime64[W] de numpy commencent le jeudi (l'époque
+    # 1970-01-01 en est un) alors que les périodes 'W' de pandas vont du
+    # lundi au dimanche. Le décalage de 3 jours aligne la division entière
+    # sur les lundis; la clé retournée est le lundi de la semaine, que
+    # PeriodIndex replace ensuite dans la bonne période W-SUN
+    jours = dates64.astype('datetime64[D]').view(np.int64)
+    semaines = (jours + 3) // 7
+    return (semaines * 7 - 3).view('datetime64[D]')
+
+def _cles_mois(dates64):
+    return dates64.astype('datetime64[M]')
+
+def _cles_trimestre(dates64):
+    mois = dates64.astype('datetime64[M]').astype(np.int64)
+    return (mois - mois % 3).astype('datetime64[M]')
+
+def _cles_annee(dates64):
+    return dates64.astype('datetime64[Y]')
+
+_IMPL_CLES = {
+    'W': _cles_semaine,
+    'M': _cles_mois,
+    'Q': _cles_trimestre,
+    'Y': _cles_annee,
+}
 
-def analyser_ventes_francophones(fichier_csv, colonne_pays='pays', colonne_date='date', regroupement='M', date_debut='2020-01-01'):
+class _ErreurPreparation(Exception):
+    """Préparation du DataFrame impossible (erreur déjà affichée).
+
+    Levée plutôt que de retourner None pour que lru_cache ne mémorise
+    jamais un échec : une nouvelle tentative réaffiche le diagnostic.
     """
-    Analyse les ventes par pays et génère un graphique comparant 
-    les ventes francophones vs autres pays par période
-    
-    Parameters:
-    fichier_csv (str): Chemin vers le fichier CSV
-    colonne_pays (str): Nom de la colonne contenant les pays
-    colonne_date (str): Nom de la colonne contenant les dates
-    regroupement (str): Type de regroupement temporel
-                       'W' = semaine, 'M' = mois, 'Q' = trimestre, 'Y' = année
-    date_debut (str): Date de début d'analyse au format 'YYYY-MM-DD' (par défaut '2020-01-01')
+
+def _prepare_df(fichier_csv, colonne_pays, colonne_date, date_debut):
+    """
+    Charge le CSV, filtre sur la date de début et classe les pays
+    francophones. Le résultat est mis en cache (clé : fichier + date de
+    modification + paramètres) pour que les analyses répétées sur le même
+    export ne refassent pas la lecture/le parsing. Seules les préparations
+    réussies sont mises en cache.
+
+    Retourne le DataFrame préparé, ou None en cas d'erreur (déjà affichée).
     """
-    
-    # Lecture du fichier CSV
     try:
-        # Lecture avec séparateur point-virgule pour les fichiers Dolibarr
-        df = pd.read_csv(fichier_csv, sep=';')
-        print(f"Fichier chargé avec succès: {len(df)} lignes")
+        mtime = os.path.getmtime(fichier_csv)
+    except OSError:
+        print(f"Erreur: Le fichier {fichier_csv} n'a pas été trouvé")
+        return None
+    try:
+        return _prepare_df_cache(fichier_csv, mtime, colonne_pays, colonne_date, date_debut)
+    except _ErreurPreparation:
+        return None
+
+@lru_cache(maxsize=8)
+def _prepare_df_cache(fichier_csv, mtime, colonne_pays, colonne_date, date_debut):
+    # Lecture de l'en-tête seul pour vérifier les colonnes demandées
+    try:
+        colonnes_fichier = pd.read_csv(fichier_csv, sep=';', nrows=0).columns
     except FileNotFoundError:
         print(f"Erreur: Le fichier {fichier_csv} n'a pas été trouvé")
-        return
+        raise _ErreurPreparation
     except Exception as e:
         print(f"Erreur lors du chargement du fichier: {e}")
-        return
-    
-    # Vérification des colonnes     
-    if colonne_pays not in df.columns:
+        raise _ErreurPreparation
+
+    # Vérification des colonnes
+    if colonne_pays not in colonnes_fichier:
         print(f"Erreur: La colonne '{colonne_pays}' n'existe pas dans le fichier")
-        print(f"Colonnes disponibles: {list(df.columns)}")
-        return
-    
-    if colonne_date not in df.columns:
+        print(f"Colonnes disponibles: {list(colonnes_fichier)}")
+        raise _ErreurPreparation
+
+    if colonne_date not in colonnes_fichier:
         print(f"Erreur: La colonne '{colonne_date}' n'existe pas dans le fichier")
-        print(f"Colonnes disponibles: {list(df.columns)}")
-        return
-    
-    # Conversion de la colonne date
+        print(f"Colonnes disponibles: {list(colonnes_fichier)}")
+        raise _ErreurPreparation
+
+    # Lecture du fichier CSV
     try:
-        df[colonne_date] = pd.to_datetime(df[colonne_date])
+        # Lecture avec séparateur point-virgule pour les fichiers Dolibarr,
+        # limitée aux deux colonnes utiles : les dates sont parsées à la volée
+        # et la colonne pays lue directement en catégorie, ce qui réduit les
+        # octets lus et parsés au prorata des colonnes ignorées. Les exports
+        # Dolibarr datent en ISO 8601 ('YYYY-MM-DD HH:MM:SS') : le format
+        # explicite active le parseur C rapide au lieu de l'inférence de
+        # format élément par élément
+        df = pd.read_csv(fichier_csv, sep=';',
+                         usecols=[colonne_pays, colonne_date],
+                         dtype={colonne_pays: 'category'},
+                         parse_dates=[colonne_date],
+                         date_format='ISO8601',
+                         dayfirst=False, cache_dates=True, engine='c')
+        print(f"Fichier chargé avec succès: {len(df)} lignes")
     except Exception as e:
-        print(f"Erreur lors de la conversion des dates: {e}")
-        return
-    
+        print(f"Erreur lors du chargement du fichier: {e}")
+        raise _ErreurPreparation
+
+    # Conversion de la colonne date si le parsing à la lecture n'a pas abouti
+    # (avec un format non ISO, read_csv laisse la colonne en object sans
+    # lever d'erreur) : repli sur pd.to_datetime avec inférence de format
+    if not pd.api.types.is_datetime64_any_dtype(df[colonne_date]):
+        try:
+            df[colonne_date] = pd.to_datetime(df[colonne_date])
+        except Exception as e:
+            print(f"Erreur lors de la conversion des dates: {e}")
+            raise _ErreurPreparation
+
     # Filtrage des données selon la date de début spécifiée
     try:
-        date_limite = pd.to_datetime(date_debut)
+        date_limite = np.datetime64(date_debut)
         df_original_count = len(df)
-        df = df[df[colonne_date] >= date_limite]
+        dates = df[colonne_date].values
+        if dates.size > 1 and np.all(np.diff(dates.view('i8')) >= 0):
+            # Export trié par date (le cas habituel pour Dolibarr) :
+            # searchsorted trouve le point de coupe en O(log N) et le slice
+            # contigu évite le masque booléen et la copie dispersée
+            df = df.iloc[np.searchsorted(dates, date_limite):]
+        else:
+            # Sinon, comparaison numpy directe sur les valeurs datetime64
+            df = df.loc[dates >= date_limite]
         print(f"Filtrage des données après le {date_debut}: {len(df)} lignes conservées sur {df_original_count}")
-        
-        if len(df) == 0:
-            print(f"Aucune donnée trouvée après le {date_debut}")
-            return
     except Exception as e:
         print(f"Erreur lors du filtrage par date (format attendu: YYYY-MM-DD): {e}")
+        raise _ErreurPreparation
+
+    if len(df) == 0:
+        print(f"Aucune donnée trouvée après le {date_debut}")
+        raise _ErreurPreparation
+
+    # Cas limite : colonne pays sans aucune catégorie (toutes les cellules
+    # vides). Rien à normaliser ni à classer — tout est non francophone —
+    # et les remappages de codes ci-dessous supposent au moins une catégorie
+    if len(df[colonne_pays].cat.categories) == 0:
+        df['est_francophone'] = np.zeros(len(df), dtype=bool)
+        return df
+
+    # Normalisation des codes pays (majuscules vers minuscules, suppression
+    # espaces) par les routines chaînes vectorisées de numpy, appliquées au
+    # seul tableau des catégories uniques : aucun objet str Python n'est créé
+    # ligne à ligne. Les catégories identiques après normalisation (ex: 'FR'
+    # et ' fr ') sont fusionnées en remappant les codes entiers
+    normalisees = np.char.strip(np.char.lower(
+        np.asarray(df[colonne_pays].cat.categories, dtype='U')))
+    categories_norm, remap = np.unique(normalisees, return_inverse=True)
+    codes_bruts = df[colonne_pays].cat.codes.to_numpy()
+    nouveaux_codes = np.where(codes_bruts >= 0, remap[codes_bruts], -1)
+    cat = pd.Categorical.from_codes(nouveaux_codes, categories=categories_norm)
+    df[colonne_pays] = cat
+
+    # Classification francophone/non-francophone : les deux lettres de chaque
+    # catégorie donnent un indice dans _TABLE_FRANCO (lecture directe, pas de
+    # hachage), puis le résultat est propagé aux lignes via les codes entiers.
+    # Les catégories mal formées (vides, trop longues, caractères non ascii
+    # minuscules) sont classées non francophones
+    lettres = categories_norm.astype('U2').view(np.uint32).reshape(-1, 2)
+    indices = (lettres[:, 0] - 97) * 26 + (lettres[:, 1] - 97)
+    valides = ((lettres >= 97) & (lettres <= 122)).all(axis=1) \
+        & (np.char.str_len(categories_norm) == 2)
+    franco_par_categorie = np.zeros(len(categories_norm), dtype=bool)
+    franco_par_categorie[valides] = _TABLE_FRANCO[indices[valides]]
+    df['est_francophone'] = np.where(cat.codes >= 0,
+                                     franco_par_categorie[cat.codes], False)
+
+    return df
+
+def analyser_ventes_francophones(fichier_csv, colonne_pays='pays', colonne_date='date', regroupement='M', date_debut='2020-01-01', ax=None, plot=True):
+    """
+    Analyse les ventes par pays et génère un graphique comparant
+    les ventes francophones vs autres pays par période
+
+    Parameters:
+    fichier_csv (str ou DataFrame): Chemin vers le fichier CSV, ou DataFrame
+                                    déjà préparé par _prepare_df (réutilisé tel quel)
+    colonne_pays (str): Nom de la colonne contenant les pays
+    colonne_date (str): Nom de la colonne contenant les dates
+    regroupement (str): Type de regroupement temporel
+                       'W' = semaine, 'M' = mois, 'Q' = trimestre, 'Y' = année
+    date_debut (str): Date de début d'analyse au format 'YYYY-MM-DD' (par défaut '2020-01-01')
+    ax (matplotlib.axes.Axes): Axe existant sur lequel tracer; si None, une
+                               figure dédiée est créée puis affichée/sauvegardée
+    plot (bool): Si False, aucun graphique n'est tracé (et matplotlib n'est
+                 pas configuré) : seuls les DataFrames sont calculés et retournés
+    """
+
+    # Préparation des données (lecture, filtre, classification), sauf si un
+    # DataFrame déjà préparé est fourni directement
+    if isinstance(fichier_csv, pd.DataFrame):
+        df = fichier_csv
+    else:
+        df = _prepare_df(fichier_csv, colonne_pays, colonne_date, date_debut)
+    if df is None:
         return
-    
-    # Définition des codes pays francophones (ISO 2 lettres)
-    pays_francophones = ['fr', 'be', 'ch', 'nc', 'ca', 'lu']  # France, Belgique, Suisse, Nouvelle-Calédonie, Canada, Luxembourg
 
-    # Normalisation des codes pays (majuscules vers minuscules, suppression espaces)
-    df[colonne_pays] = df[colonne_pays].str.lower().str.strip()
-    
-    # Classification francophone/non-francophone
-    df['est_francophone'] = df[colonne_pays].isin(pays_francophones)
-    
     # Définition des libellés pour les périodes
     regroupements_labels = {
         'W': 'semaine',
@@ -89,116 +284,178 @@ def analyser_ventes_francophones(fichier_csv, colonne_pays='pays', colonne_date=
     
     periode_label = regroupements_labels[regroupement]
     
-    # Extraction de la période selon le regroupement choisi
-    df['periode'] = df[colonne_date].dt.to_period(regroupement)
-    
-    # Comptage des ventes par période et type
-    ventes_par_periode = df.groupby(['periode', 'est_francophone']).size().unstack(fill_value=0)
-    
-    # Renommage des colonnes
-    ventes_par_periode.columns = ['Autres pays', 'Pays francophones']
-    
-    # Si une colonne manque, on l'ajoute avec des zéros
-    if 'Autres pays' not in ventes_par_periode.columns:
-        ventes_par_periode['Autres pays'] = 0
-    if 'Pays francophones' not in ventes_par_periode.columns:
-        ventes_par_periode['Pays francophones'] = 0   
+    # Extraction de la période par la variante spécialisée pour ce
+    # regroupement (arithmétique datetime64 pure, constantes en dur). La
+    # conversion en PeriodIndex n'a lieu qu'à l'affichage, sur le petit
+    # tableau des périodes uniques
+    cles = _IMPL_CLES[regroupement](df[colonne_date].values)
+
+    # Comptage des ventes par période et type, sans groupby ni unstack. Les
+    # deux colonnes existent toujours, même quand un des deux groupes est vide.
+    # Avec numba, le kernel fusionné cumule en une seule passe mémoire dans
+    # une matrice dense indexée par (clé - clé minimale), sans le tri de
+    # np.unique; les périodes creuses sont ensuite éliminées. Sans numba,
+    # np.add.at sur les codes de np.unique fait le même travail
+    franco8 = df['est_francophone'].to_numpy().astype(np.int8)
+    if numba is not None and cles.size:
+        cle_min, counts_dense = _compter_par_periode(cles.view(np.int64), franco8)
+        occupees = counts_dense.any(axis=1)
+        uniq = (np.flatnonzero(occupees) + cle_min).view(cles.dtype)
+        counts = counts_dense[occupees]
+    else:
+        uniq, inv = np.unique(cles, return_inverse=True)
+        counts = np.zeros((uniq.size, 2), dtype=np.int32)
+        np.add.at(counts, (inv, franco8), 1)
+    ventes_par_periode = pd.DataFrame(
+        counts,
+        index=pd.PeriodIndex(uniq, freq=regroupement),
+        columns=['Autres pays', 'Pays francophones']
+    )
+    ventes_par_periode.index.name = 'periode'
     
-    # Calcul du total pour chaque période
+    # Calcul du total pour chaque période (reste en int32, hérité des
+    # colonnes de comptage : largement suffisant pour des ventes par période)
     ventes_par_periode['Total'] = ventes_par_periode['Autres pays'] + ventes_par_periode['Pays francophones']
     
-    # Calcul des pourcentages
-    ventes_pourcentages = ventes_par_periode.copy()
-    # Éviter la division par zéro
-    mask_non_zero = ventes_par_periode['Total'] > 0
-    ventes_pourcentages.loc[mask_non_zero, 'Pays francophones'] = (
-        ventes_par_periode.loc[mask_non_zero, 'Pays francophones'] / 
-        ventes_par_periode.loc[mask_non_zero, 'Total'] * 100
-    )
-    ventes_pourcentages.loc[mask_non_zero, 'Autres pays'] = (
-        ventes_par_periode.loc[mask_non_zero, 'Autres pays'] / 
-        ventes_par_periode.loc[mask_non_zero, 'Total'] * 100
-    )
+    # Calcul des pourcentages en une seule division numpy vectorisée
+    # (la division par zéro est neutralisée par where=, sans copie du
+    # DataFrame ni écritures .loc masquées colonne par colonne). Tout se
+    # fait en float32 : largement suffisant pour un affichage en 'XX.X%'
+    # et moitié moins de trafic mémoire que float64
+    vals = ventes_par_periode[['Autres pays', 'Pays francophones']] \
+        .to_numpy().astype(np.float32)
+    totals_col = vals.sum(axis=1, keepdims=True)
+    pct = np.divide(vals * np.float32(100.0), totals_col,
+                    out=np.zeros_like(vals),
+                    where=totals_col > 0)
+    ventes_pourcentages = pd.DataFrame(pct, index=ventes_par_periode.index,
+                                       columns=['Autres pays', 'Pays francophones'])
     # Le total est toujours 100% quand il y a des ventes
-    ventes_pourcentages.loc[mask_non_zero, 'Total'] = 100
-    ventes_pourcentages.loc[~mask_non_zero, :] = 0
-    
-    # Création du graphique avec double axe Y
-    fig, ax1 = plt.subplots(figsize=(14, 8))
-    
-    # Conversion de l'index en datetime pour un meilleur affichage
-    x_dates = ventes_pourcentages.index.to_timestamp()
-    
-    # Premier axe Y : Pourcentages
-    line1 = ax1.plot(x_dates, ventes_pourcentages['Pays francophones'], 
-            marker='o', linewidth=2.5, label='Pays francophones (%)', color='#2E86AB')
-    line2 = ax1.plot(x_dates, ventes_pourcentages['Autres pays'], 
-            marker='s', linewidth=2.5, label='Autres pays (%)', color='#A23B72')
-    
-    # Ajout des valeurs sur les points pour les pourcentages
-    for i, (date, franco, autres) in enumerate(zip(x_dates, ventes_pourcentages['Pays francophones'], ventes_pourcentages['Autres pays'])):
-        # Valeurs pour pays francophones (en haut)
-        ax1.annotate(f'{franco:.1f}%', 
-                    (date, franco), 
-                    textcoords="offset points", 
-                    xytext=(0,10), 
-                    ha='center', 
-                    fontsize=9, 
-                    color='#2E86AB',
-                    fontweight='bold')
-        
-        # Valeurs pour autres pays (en bas)
-        ax1.annotate(f'{autres:.1f}%', 
-                    (date, autres), 
-                    textcoords="offset points", 
-                    xytext=(0,-15), 
-                    ha='center', 
-                    fontsize=9, 
-                    color='#A23B72',
-                    fontweight='bold')
-    
-    # Configuration du premier axe Y (pourcentages)
-    ax1.set_xlabel(f'{periode_label.capitalize()}', fontsize=12, fontweight='bold')
-    ax1.set_ylabel('Pourcentage des ventes (%)', fontsize=12, fontweight='bold', color='black')
-    ax1.set_ylim(0, 100)
-    ax1.tick_params(axis='x', rotation=45)
-    ax1.grid(True, alpha=0.3)
-    
-    # Création du second axe Y pour le nombre total de ventes
-    ax2 = ax1.twinx()
-    line3 = ax2.plot(x_dates, ventes_par_periode['Total'], 
-            marker='^', linewidth=2.5, label='Nombre total de ventes', 
-            color='#F18F01', linestyle='--', alpha=0.8)
-    
-    # Ajout des valeurs sur les points pour le nombre total
-    for i, (date, total) in enumerate(zip(x_dates, ventes_par_periode['Total'])):
-        ax2.annotate(f'{total}', 
-                    (date, total), 
-                    textcoords="offset points", 
-                    xytext=(0,10), 
-                    ha='center', 
-                    fontsize=9, 
-                    color='#F18F01',
-                    fontweight='bold')
-    
-    # Configuration du second axe Y (nombres absolus)
-    ax2.set_ylabel('Nombre total de ventes', fontsize=12, fontweight='bold', color='#F18F01')
-    ax2.tick_params(axis='y', labelcolor='#F18F01')
-    
-    # Titre du graphique
-    ax1.set_title(f'Évolution des ventes par {periode_label}\nPourcentages francophones/autres + Volume total', 
-                fontsize=16, fontweight='bold', pad=20)
-    
-    # Légendes combinées
-    lines1, labels1 = ax1.get_legend_handles_labels()
-    lines2, labels2 = ax2.get_legend_handles_labels()
-    ax1.legend(lines1 + lines2, labels1 + labels2, fontsize=11, loc='upper left')
-    
-    # Ajustement de la mise en page
-    plt.tight_layout()
-    
-    # Affichage du graphique
-    plt.show()
+    ventes_pourcentages['Total'] = np.where(totals_col[:, 0] > 0,
+                                            np.float32(100.0), np.float32(0.0))
+    
+    # Tracé du graphique, uniquement si demandé : avec plot=False la
+    # fonction se contente de calculer et retourner les DataFrames, sans
+    # toucher à matplotlib ni appliquer les styles
+    if plot:
+        _configurer_style()
+
+        # Création du graphique avec double axe Y, sauf si un axe partagé est
+        # fourni par l'appelant (cas de la grille d'analyser_multiple_regroupements,
+        # où le coût fixe de la figure n'est payé qu'une fois). La mise en page
+        # contrainte est choisie dès la création : contrairement à tight_layout()
+        # appelé après coup, elle n'impose pas une passe de rendu supplémentaire
+        # pour mesurer les boîtes englobantes de tous les textes
+        figure_locale = ax is None
+        if figure_locale:
+            fig, ax1 = plt.subplots(figsize=(14, 8), layout='constrained')
+        else:
+            ax1 = ax
+            fig = ax1.figure
+    
+        # Conversion de l'index en datetime pour un meilleur affichage
+        x_dates = ventes_pourcentages.index.to_timestamp()
+    
+        # Premier axe Y : Pourcentages
+        line1 = ax1.plot(x_dates, ventes_pourcentages['Pays francophones'], 
+                marker='o', linewidth=2.5, label='Pays francophones (%)', color='#2E86AB')
+        line2 = ax1.plot(x_dates, ventes_pourcentages['Autres pays'], 
+                marker='s', linewidth=2.5, label='Autres pays (%)', color='#A23B72')
+    
+        # Ajout des valeurs sur les points pour les pourcentages
+        # Les textes sont créés en lot (un objet Text par valeur, sans passer par
+        # ax1.annotate) : le décalage vertical est précalculé en unités de données,
+        # ce qui évite une transformation d'offset par point et accélère nettement
+        # le rendu sur les longues séries (ex: hebdomadaire depuis 2014)
+        franco_pct = ventes_pourcentages['Pays francophones'].to_numpy()
+        autres_pct = ventes_pourcentages['Autres pays'].to_numpy()
+        x_num = mdates.date2num(x_dates)
+        n_points = x_num.size
+        decalage_pct = 2.5  # équivalent de l'offset de 10 points sur un axe 0-100
+
+        # Garde-fou sur le nombre d'étiquettes : au-delà d'une trentaine de
+        # points (ex: hebdomadaire depuis 2014), on n'étiquette qu'un point
+        # sur k — personne ne lit 500 étiquettes et chaque texte a un coût au
+        # rendu. Les abscisses retenues sont ensuite projetées en pixels (une
+        # seule transformation vectorisée) pour écarter celles trop serrées
+        pas = max(1, n_points // 30)
+        candidats = np.arange(0, n_points, pas)
+        if candidats.size > 1:
+            x_pix = ax1.transData.transform(
+                np.column_stack((x_num[candidats], np.zeros(candidats.size))))[:, 0]
+            indices_etiquettes = [candidats[0]]
+            dernier_pix = x_pix[0]
+            for j in range(1, candidats.size):
+                if abs(x_pix[j] - dernier_pix) >= 25:
+                    indices_etiquettes.append(candidats[j])
+                    dernier_pix = x_pix[j]
+        else:
+            indices_etiquettes = list(candidats)
+
+        # Itération par indice entier sur les tableaux numpy matérialisés :
+        # pas de zip qui emboîte chaque valeur dans un scalaire Python
+        textes_pct = [
+            mtext.Text(x_num[i], valeurs[i] + decalage, f'{valeurs[i]:.1f}%',
+                       ha='center', fontsize=9, color=couleur,
+                       fontweight='bold', transform=ax1.transData)
+            for valeurs, decalage, couleur in (
+                (franco_pct, decalage_pct, '#2E86AB'),
+                (autres_pct, -1.5 * decalage_pct, '#A23B72'),
+            )
+            for i in indices_etiquettes
+        ]
+        for texte in textes_pct:
+            ax1.add_artist(texte)
+    
+        # Configuration du premier axe Y (pourcentages)
+        ax1.set_xlabel(f'{periode_label.capitalize()}', fontsize=12, fontweight='bold')
+        ax1.set_ylabel('Pourcentage des ventes (%)', fontsize=12, fontweight='bold', color='black')
+        ax1.set_ylim(0, 100)
+        ax1.tick_params(axis='x', rotation=45)
+        ax1.grid(True, alpha=0.3)
+    
+        # Création du second axe Y pour le nombre total de ventes
+        ax2 = ax1.twinx()
+        line3 = ax2.plot(x_dates, ventes_par_periode['Total'], 
+                marker='^', linewidth=2.5, label='Nombre total de ventes', 
+                color='#F18F01', linestyle='--', alpha=0.8)
+    
+        # Ajout des valeurs sur les points pour le nombre total
+        # Même technique de création en lot que pour les pourcentages
+        totals = ventes_par_periode['Total'].to_numpy()
+        decalage_total = 0.02 * max(totals.max(), 1)
+        textes_total = [
+            mtext.Text(x_num[i], totals[i] + decalage_total, f'{totals[i]}',
+                       ha='center', fontsize=9, color='#F18F01',
+                       fontweight='bold', transform=ax2.transData)
+            for i in indices_etiquettes
+        ]
+        for texte in textes_total:
+            ax2.add_artist(texte)
+    
+        # Configuration du second axe Y (nombres absolus)
+        ax2.set_ylabel('Nombre total de ventes', fontsize=12, fontweight='bold', color='#F18F01')
+        ax2.tick_params(axis='y', labelcolor='#F18F01')
+    
+        # Titre du graphique
+        ax1.set_title(f'Évolution des ventes par {periode_label}\nPourcentages francophones/autres + Volume total', 
+                    fontsize=16, fontweight='bold', pad=20)
+    
+        # Légendes combinées
+        lines1, labels1 = ax1.get_legend_handles_labels()
+        lines2, labels2 = ax2.get_legend_handles_labels()
+        ax1.legend(lines1 + lines2, labels1 + labels2, fontsize=11, loc='upper left')
+    
+        # Affichage du graphique (ou sauvegarde en PNG avec le backend Agg,
+        # qui n'a pas de fenêtre d'affichage). Sur un axe partagé, l'affichage
+        # est laissé à l'appelant qui gère la figure complète
+        if figure_locale:
+            if matplotlib.get_backend().lower() == 'agg':
+                nom_image = f'ventes_francophones_{regroupement}.png'
+                fig.savefig(nom_image)
+                print(f"Graphique sauvegardé dans {nom_image}")
+            else:
+                plt.show()
     
     # Affichage des statistiques
     print("\n" + "="*50)
@@ -218,11 +475,14 @@ def analyser_ventes_francophones(fichier_csv, colonne_pays='pays', colonne_date=
         print(f"Pourcentage francophones: {pourcentage_franco:.1f}%")
         print(f"Pourcentage autres pays: {100-pourcentage_franco:.1f}%")
     
-    print(f"\nDétail par {periode_label} (en pourcentage):")
-    print(ventes_pourcentages.round(1).to_string())
-    
-    print(f"\nDétail par {periode_label} (nombres absolus):")
-    print(ventes_par_periode.to_string())
+    # Les détails sont streamés vers stdout via to_csv : les cellules sont
+    # écrites au fil de l'eau en C, sans construire toute la chaîne en
+    # mémoire comme to_string(), et float_format remplace l'arrondi préalable
+    sys.stdout.write(f"\nDétail par {periode_label} (en pourcentage):\n")
+    ventes_pourcentages.to_csv(sys.stdout, sep='\t', float_format='%.1f')
+
+    sys.stdout.write(f"\nDétail par {periode_label} (nombres absolus):\n")
+    ventes_par_periode.to_csv(sys.stdout, sep='\t')
     
     return ventes_par_periode, ventes_pourcentages
 
@@ -244,19 +504,40 @@ def analyser_multiple_regroupements(fichier_csv, colonne_pays='Customer country
     }
     
     print("=== ANALYSE AVEC DIFFÉRENTS REGROUPEMENTS ===\n")
-    
-    for code, nom in regroupements.items():
+
+    # Préparation des données une seule fois : seules les 4 agrégations
+    # par période diffèrent d'un regroupement à l'autre
+    df = _prepare_df(fichier_csv, colonne_pays, colonne_date, date_debut)
+    if df is None:
+        return
+
+    # Une seule figure partagée en grille 2x2 : le coût fixe de matplotlib
+    # (style, mise en page, rendu) n'est payé qu'une fois pour les 4 analyses.
+    # Le style doit être appliqué avant la création de la figure, sinon la
+    # grille garderait l'apparence matplotlib par défaut
+    _configurer_style()
+    fig, axes = plt.subplots(2, 2, figsize=(20, 12), layout='constrained')
+
+    for (code, nom), ax in zip(regroupements.items(), axes.flat):
         print(f"\n{'='*60}")
         print(f"ANALYSE PAR {nom.upper()}")
         print(f"{'='*60}")
-        
+
         try:
-            analyser_ventes_francophones(fichier_csv, colonne_pays, colonne_date, code, date_debut)
+            analyser_ventes_francophones(df, colonne_pays, colonne_date, code, date_debut, ax=ax)
         except Exception as e:
             print(f"Erreur lors de l'analyse par {nom.lower()}: {e}")
-        
+
         print("\n")
 
+    # Affichage ou sauvegarde de la grille complète, en une seule passe
+    if matplotlib.get_backend().lower() == 'agg':
+        nom_image = 'ventes_francophones_regroupements.png'
+        fig.savefig(nom_image)
+        print(f"Graphiques sauvegardés dans {nom_image}")
+    else:
+        plt.show()
+
 # Exemple d'utilisation
 if __name__ == "__main__":
     # Remplacez 'votre_fichier.csv' par le chemin vers votre fichier